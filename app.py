@@ -38,8 +38,9 @@ _ensure_ingest()
 st_autorefresh(interval=REFRESH_SECONDS*1000, key="data_refresh")
 
 # ── 4. Backend helpers ───────────────────────────────────────────
-from backend.agents import ingest, cost, toll, hazard, traffic
+from backend.agents import ingest, cost, emission, toll, hazard, traffic
 from backend.agents import risk_agent as gpt_risk
+from backend import upstream
 
 # ── 5. KPI state (rolling window) ────────────────────────────────
 WIN = 50
@@ -152,9 +153,23 @@ if run_btn:
 
     with st.spinner("Calling Mapbox, Risk Agent, Toll API, etc..."):
         url = f"https://api.mapbox.com/directions/v5/mapbox/driving/{f_lon},{f_lat};{t_lon},{t_lat}"
-        routes = httpx.get(url, params={
-            "alternatives": "true", "overview": "full", "geometries": "polyline",
-            "access_token": MBX}, timeout=20).json()["routes"][:3]
+        def _directions():
+            resp = httpx.get(url, params={
+                "alternatives": "true", "overview": "full", "geometries": "polyline",
+                "access_token": MBX}, timeout=20)
+            resp.raise_for_status()        # only cache successful payloads
+            return resp.json()
+
+        try:
+            routes = upstream.call(
+                "mapbox", ("directions", f_lon, f_lat, t_lon, t_lat), _directions
+            )["routes"][:3]
+        except upstream.Overloaded:
+            st.error("Mapbox is busy right now – please retry in a few seconds.")
+            st.stop()
+        except httpx.HTTPStatusError as exc:
+            st.error(f"Mapbox error {exc.response.status_code}")
+            st.stop()
 
         enriched = []
         for r in routes:
@@ -170,7 +185,7 @@ if run_btn:
                 toll_price = 0.0
             has_hazard = hazard.route_passes_hazard(r["geometry"], hazards_fc["features"])
             has_traffic = traffic.route_passes_traffic(r["geometry"], traffic_fc["features"])
-            emissions = km * 0.25
+            emissions = emission.estimate_emissions(km)
             promise_ok = eta <= DELIVERY_DEADLINE_MIN
 
             enriched.append({
@@ -178,7 +193,7 @@ if run_btn:
                 "distance_km": round(km, 2),
                 "eta":        round(eta, 1),
                 "toll_price": round(toll_price, 2),
-                "cost":       round(cost.estimate_cost(km, eta), 2) + toll_price,
+                "cost":       round(cost.estimate_cost(km, eta, toll_price), 2),
                 "delay":      risk["delay_prob"],
                 "avoid":      risk.get("avoid_coords", []),
                 "hazard_safe": int(not has_hazard),
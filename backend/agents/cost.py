@@ -1,6 +1,13 @@
 # backend/agents/cost.py
-FUEL_PER_KM_AUD = 0.25
-DRIVER_PER_HOUR_AUD = 50
+from backend.agents import scenario
+
+_VEHICLE = scenario.VEHICLE_PROFILES[scenario.DEFAULT_VEHICLE]
+_PRICES = scenario.PRICE_SCENARIOS[scenario.DEFAULT_PRICES]
+
+FUEL_PER_KM_AUD = _VEHICLE["fuel_l_per_km"] * _PRICES["diesel_aud_per_l"]
+DRIVER_PER_HOUR_AUD = _VEHICLE["wage_aud_per_hour"]
+
 
 def estimate_cost(distance_km: float, eta_min: float, toll: float = 0.0) -> float:
-    return distance_km * FUEL_PER_KM_AUD + (eta_min / 60) * DRIVER_PER_HOUR_AUD + toll
\ No newline at end of file
+    """Default-vehicle cost (AUD); `toll` is the toll as quoted, added unscaled."""
+    return scenario.default_estimate(distance_km, eta_min)[0] + toll
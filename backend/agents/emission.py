@@ -1,3 +1,8 @@
-def estimate_emissions(distance_km: float, emission_factor: float = 0.25) -> float:
-    """Estimate emissions in kg CO₂ (default: 0.25 kg/km for car/truck)."""
-    return distance_km * emission_factor
\ No newline at end of file
+from backend.agents import scenario
+
+
+def estimate_emissions(distance_km: float, emission_factor: float = None) -> float:
+    """Estimate emissions in kg CO₂ (default: the scenario engine's default vehicle)."""
+    if emission_factor is not None:
+        return distance_km * emission_factor
+    return scenario.default_estimate(distance_km)[1]
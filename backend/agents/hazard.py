@@ -1,6 +1,12 @@
 def route_passes_hazard(route_polyline: str, hazard_features, radius=0.001) -> bool:
     """Returns True if the route passes near any known hazard."""
     import polyline
+    from backend.agents import lanes
+    nearby = lanes.candidate_hazards(route_polyline, hazard_features, radius * lanes.KM_PER_DEG)
+    if nearby is not None:
+        if not nearby:
+            return False
+        hazard_features = nearby
     for lat, lon in polyline.decode(route_polyline):
         for feat in hazard_features:
             hx, hy = feat["geometry"]["coordinates"]
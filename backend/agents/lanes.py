@@ -0,0 +1,261 @@
+"""
+FreightFlow – lane corridor registry
+Pre-computes the geohash cells covering each recurring depot → customer lane
+so hazard proximity checks become a set intersection instead of a full
+vertex × hazard scan.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from math import cos, radians
+from pathlib import Path
+
+from polyline import decode as poly_decode
+
+log = logging.getLogger(__name__)
+
+# ───────────────────────── Config ─────────────────────────
+REGISTRY_PATH = Path("data/lanes/registry.json")
+PRECISION = 6  # ≈ 1.0 km × 0.6 km cells around Sydney
+BUFFER_KM = 1.0  # must cover the widest check (risk.DIST_THRESHOLD_KM)
+KM_PER_DEG = 110.57  # shortest degree of latitude, so buffers round outward
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Swapped as a whole on reload so readers always see one consistent version
+_registry = {"mtime": None, "lanes": {}, "by_polyline": {}, "meta": {}}
+_snapshots = OrderedDict()  # id(features) -> (features, precision, {cell: [i, …]})
+_snapshots_lock = threading.Lock()
+SNAPSHOT_CACHE_SIZE = 4
+
+
+# ───────────────────────── Geohash helpers ─────────────────
+def _geohash(lat: float, lon: float, precision: int = PRECISION) -> str:
+    """Encode a point as a geohash string of `precision` characters."""
+    lat_rng, lon_rng = [-90.0, 90.0], [-180.0, 180.0]
+    out, bits, ch, even = [], 0, 0, True
+    while len(out) < precision:
+        rng, val = (lon_rng, lon) if even else (lat_rng, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if val >= mid:
+            ch = (ch << 1) | 1
+            rng[0] = mid
+        else:
+            ch <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(out)
+
+
+def _cell_size_deg(precision: int) -> tuple:
+    """Return (lat_deg, lon_deg) spanned by one cell at `precision`."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = (5 * precision) // 2
+    return 180.0 / 2**lat_bits, 360.0 / 2**lon_bits
+
+
+def _steps(lo: float, hi: float, step: float):
+    """Yield lo, lo+step, … and always hi, so no cell in [lo, hi] is skipped."""
+    v = lo
+    while v < hi:
+        yield v
+        v += step
+    yield hi
+
+
+def corridor_cells(
+    polyline: str, buffer_km: float = BUFFER_KM, precision: int = PRECISION
+) -> set:
+    """Return every cell within `buffer_km` of any vertex of `polyline`."""
+    # Step just under one cell so float error can never skip a column/row
+    cell_lat, cell_lon = (d * 0.99 for d in _cell_size_deg(precision))
+    cells = set()
+    for lat, lon in poly_decode(polyline):
+        d_lat = buffer_km / KM_PER_DEG
+        d_lon = buffer_km / (KM_PER_DEG * max(cos(radians(lat)), 1e-6))
+        for y in _steps(lat - d_lat, lat + d_lat, cell_lat):
+            for x in _steps(lon - d_lon, lon + d_lon, cell_lon):
+                cells.add(_geohash(y, x, precision))
+    return cells
+
+
+def _feature_cell(feat: dict, precision: int = PRECISION) -> str:
+    """Cell of a GeoJSON point feature ([lon, lat] coordinates)."""
+    lon, lat = feat["geometry"]["coordinates"][:2]
+    return _geohash(lat, lon, precision)
+
+
+def hazard_index(features, precision: int = PRECISION) -> dict:
+    """
+    Return {cell: [feature index, …]} for a hazard snapshot, computed once
+    per features list. The list itself is kept in the cache so its id
+    cannot be reused by another snapshot while the entry is alive.
+    """
+    with _snapshots_lock:
+        hit = _snapshots.get(id(features))
+    if hit and hit[0] is features and hit[1] == precision:
+        return hit[2]
+    index = {}
+    for i, feat in enumerate(features):
+        index.setdefault(_feature_cell(feat, precision), []).append(i)
+    with _snapshots_lock:
+        _snapshots[id(features)] = (features, precision, index)
+        _snapshots.move_to_end(id(features))
+        while len(_snapshots) > SNAPSHOT_CACHE_SIZE:
+            _snapshots.popitem(last=False)
+    return index
+
+
+# ───────────────────────── Registry I/O ────────────────────
+def lane_id(polyline: str) -> str:
+    """Stable id for a lane that was registered without an explicit name."""
+    return hashlib.sha1(polyline.encode()).hexdigest()[:12]
+
+
+def _load() -> dict:
+    """
+    (Re)load the registry if the file changed since the last call and return
+    it. Callers should load once and use the returned dict for every lookup.
+    """
+    global _registry
+    try:
+        mtime = (REGISTRY_PATH, REGISTRY_PATH.stat().st_mtime)
+    except FileNotFoundError:
+        mtime = None
+    reg = _registry
+    if mtime != reg["mtime"]:
+        lanes, by_polyline, meta = {}, {}, {}
+        if mtime is not None:
+            try:
+                doc = json.loads(REGISTRY_PATH.read_text())
+                lanes = {
+                    k: {"polyline": v["polyline"], "cells": set(v["cells"])}
+                    for k, v in doc.get("lanes", {}).items()
+                }
+                by_polyline = {v["polyline"]: k for k, v in lanes.items()}
+                meta = {k: doc[k] for k in ("precision", "buffer_km") if k in doc}
+            except Exception as exc:
+                # A broken registry only disables the fast path
+                log.warning("Failed to parse lane registry: %s", exc)
+                lanes, by_polyline, meta = {}, {}, {}
+        reg = _registry = {
+            "mtime": mtime,
+            "lanes": lanes,
+            "by_polyline": by_polyline,
+            "meta": meta,
+        }
+    return reg
+
+
+def _save(lanes: dict, precision: int, buffer_km: float) -> None:
+    REGISTRY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    doc = {
+        "precision": precision,
+        "buffer_km": buffer_km,
+        "lanes": {
+            k: {"polyline": v["polyline"], "cells": sorted(v["cells"])}
+            for k, v in lanes.items()
+        },
+    }
+    # Readers poll this file on every request, so never expose a partial write
+    tmp = REGISTRY_PATH.with_name(REGISTRY_PATH.name + ".tmp")
+    tmp.write_text(json.dumps(doc))
+    os.replace(tmp, REGISTRY_PATH)
+    log.info("Saved %s (%d lanes)", REGISTRY_PATH, len(lanes))
+
+
+def build(routes, precision: int = PRECISION, buffer_km: float = BUFFER_KM) -> dict:
+    """
+    Add/replace lanes and write the registry.
+    `routes` is a list of {"id": optional str, "polyline": str}.
+    """
+    reg = _load()
+    if reg["meta"] and (reg["meta"].get("precision"), reg["meta"].get("buffer_km")) != (
+        precision,
+        buffer_km,
+    ):
+        # Mixed cell sizes would make intersections meaningless
+        return refresh(precision, buffer_km, extra=routes)
+    lanes = dict(reg["lanes"])
+    for r in routes:
+        poly = r["polyline"]
+        lanes[r.get("id") or lane_id(poly)] = {
+            "polyline": poly,
+            "cells": corridor_cells(poly, buffer_km, precision),
+        }
+    _save(lanes, precision, buffer_km)
+    return lanes
+
+
+def refresh(precision: int = PRECISION, buffer_km: float = BUFFER_KM, extra=()) -> dict:
+    """Recompute cells for every registered lane (plus any `extra` routes)."""
+    routes = [{"id": k, "polyline": v["polyline"]} for k, v in _load()["lanes"].items()]
+    routes.extend(extra)
+    lanes = {
+        (r.get("id") or lane_id(r["polyline"])): {
+            "polyline": r["polyline"],
+            "cells": corridor_cells(r["polyline"], buffer_km, precision),
+        }
+        for r in routes
+    }
+    _save(lanes, precision, buffer_km)
+    return lanes
+
+
+# ───────────────────────── Public lookup ───────────────────
+def _lane_cells(reg: dict, polyline: str):
+    key = reg["by_polyline"].get(polyline)
+    return reg["lanes"][key]["cells"] if key else None
+
+
+def lane_cells(polyline: str):
+    """Return the cached cell set for a registered lane, else None."""
+    return _lane_cells(_load(), polyline)
+
+
+def candidate_hazards(polyline: str, features, reach_km: float = BUFFER_KM):
+    """
+    Return only the features whose cell intersects the lane corridor, or
+    None when the route is not a registered lane (or `reach_km` is wider
+    than the registry's buffer) and the caller must scan everything.
+    """
+    reg = _load()
+    cells = _lane_cells(reg, polyline)
+    if cells is None or reach_km > reg["meta"].get("buffer_km", 0):
+        return None
+    index = hazard_index(features, reg["meta"].get("precision", PRECISION))
+    hits = sorted(i for c in index.keys() & cells for i in index[c])
+    return [features[i] for i in hits]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+    )
+    p = argparse.ArgumentParser(description="Build / refresh the lane registry")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser(
+        "build", help="add lanes from a JSON list of " '{"id": ..., "polyline": ...}'
+    )
+    b.add_argument("routes_json")
+    sub.add_parser("refresh", help="recompute cells for all registered lanes")
+    for s in sub.choices.values():
+        s.add_argument("--precision", type=int, default=PRECISION)
+        s.add_argument("--buffer-km", type=float, default=BUFFER_KM)
+    args = p.parse_args()
+
+    if args.cmd == "build":
+        routes = json.loads(Path(args.routes_json).read_text())
+        build(routes, args.precision, args.buffer_km)
+    else:
+        refresh(args.precision, args.buffer_km)
@@ -4,6 +4,8 @@ from typing import List, Tuple
 from polyline import decode as poly_decode
 from geopy.distance import geodesic
 
+from backend.agents import lanes
+
 MAJOR_TYPES = {"Crash", "Flood"}
 DIST_THRESHOLD_KM = 1.0
 
@@ -21,7 +23,13 @@ def classify_delay_prob(polyline: str, hazards: dict) -> dict:
     waypoints = _polyline_to_coords(polyline)
     avoid = []
 
-    for feat in hazards.get("features", []):
+    # Registered lanes only need the hazards inside their corridor cells
+    features = hazards.get("features", [])
+    nearby = lanes.candidate_hazards(polyline, features, DIST_THRESHOLD_KM)
+    if nearby is not None:
+        features = nearby
+
+    for feat in features:
         if feat["properties"].get("type") not in MAJOR_TYPES:
             continue
         hz_coords = [(feat["geometry"]["coordinates"][1],
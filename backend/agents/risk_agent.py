@@ -12,9 +12,33 @@ import backoff
 
 from agents import Agent, Runner, ModelSettings, function_tool
 
+from backend import upstream
+
 log = logging.getLogger(__name__)
 
 
+_snapshot = {"key": None, "features": []}
+
+
+def _latest_features() -> list:
+    """
+    Raw GeoJSON features of the most-recent snapshot, re-read only when a
+    new file lands so every caller shares one list (and one lane cell index).
+    """
+    files = sorted(Path("data/hazards").glob("*.geojson"))
+    if not files:
+        return []
+    key = (files[-1], files[-1].stat().st_mtime)
+    if key != _snapshot["key"]:
+        try:
+            features = json.loads(files[-1].read_text()).get("features", [])
+        except Exception as exc:
+            log.warning("Failed to parse hazard snapshot: %s", exc)
+            return []
+        _snapshot.update(key=key, features=features)
+    return _snapshot["features"]
+
+
 @function_tool
 def get_live_hazards() -> list:
     """
@@ -22,19 +46,14 @@ def get_live_hazards() -> list:
     Each item only contains the fields GPT actually needs:
         { "type": "Crash", "coordinates": [lon, lat] }
     """
-    files = sorted(Path("data/hazards").glob("*.geojson"))
-    if not files:
-        return []
     try:
-        raw = json.loads(files[-1].read_text()).get("features", [])
-        slim = [
+        return [
             {
                 "type": f["properties"].get("type", ""),
                 "coordinates": f["geometry"]["coordinates"],
             }
-            for f in raw
+            for f in _latest_features()
         ]
-        return slim
     except Exception as exc:
         log.warning("Failed to parse hazard snapshot: %s", exc)
         return []
@@ -60,7 +79,7 @@ risk_agent = Agent(
 
 def _safe_hazards() -> list:
     try:
-        return get_live_hazards()          # ← FunctionTool is callable
+        return _latest_features()
     except Exception as exc:
         log.warning("hazard tool failure: %s", exc)
         return []
@@ -71,6 +90,7 @@ def _safe_hazards() -> list:
     giveup=lambda e: getattr(e, "http_status", 500) != 429
 )
 def _call_gpt_sync(msg):
+    upstream.acquire("openai")             # every attempt, retries included
     return Runner.run_sync(risk_agent, [msg])
 
 
@@ -79,12 +99,18 @@ def classify_delay_prob(polyline: str) -> dict:
     Returns {"delay_prob": 0-1, …}. Falls back to legacy rule engine on:
       − missing / test API key
       − any GPT error (incl. 429 after 4 back-off retries)
+      − OpenAI budget exhausted (see backend.upstream), unless a recent
+        answer for the same polyline is cached
+    Concurrent calls for the same polyline share one GPT request.
     """
     from backend.agents import risk as rule_risk
 
+    def _rules():
+        return rule_risk.classify_delay_prob(polyline, {"features": _safe_hazards()})
+
     key = os.getenv("OPENAI_API_KEY", "")
     if not key or key.lower().startswith("test"):
-        return rule_risk.classify_delay_prob(polyline, {"features": _safe_hazards()})
+        return _rules()
 
     
     try:
@@ -92,11 +118,16 @@ def classify_delay_prob(polyline: str) -> dict:
     except RuntimeError:
         asyncio.set_event_loop(asyncio.new_event_loop())
 
-    try:
+    def _ask_gpt():
         msg = {"role": "user", "content": json.dumps({"polyline": polyline})}
-        result = _call_gpt_sync(msg)
+        output = _call_gpt_sync(msg).final_output
         log.info("Risk handled by GPT-4.1")
-        return result.final_output
+        return output
+
+    try:
+        return upstream.call(
+            "openai", ("risk", polyline), _ask_gpt, fallback=_rules, metered=False
+        )
     except (OpenAIError, Exception) as exc:
         log.warning("GPT fallback: %s", exc)
-        return rule_risk.classify_delay_prob(polyline, {"features": _safe_hazards()})
\ No newline at end of file
+        return _rules()
\ No newline at end of file
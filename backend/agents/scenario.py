@@ -0,0 +1,170 @@
+"""
+FreightFlow – fleet cost / CO₂ scenario engine
+Evaluates routes × vehicle profiles × price scenarios in one NumPy pass.
+
+    m = scenario_matrix(distance_km, eta_min, toll_aud)
+    m["cost_aud"][r, v, p]   # route r, vehicle v, price scenario p
+    m["co2_kg"][r, v]
+
+This is the single cost / emission model: cost.estimate_cost and
+emission.estimate_emissions evaluate it for DEFAULT_VEHICLE / DEFAULT_PRICES
+via default_estimate.
+"""
+
+import numpy as np
+
+# ───────────────────────── Defaults ───────────────────────
+CO2_KG_PER_L_DIESEL = 2.68
+
+# toll_class follows TfNSW: A = car / light, B = heavy vehicle
+TOLL_CLASS_MULTIPLIER = {"A": 1.0, "B": 3.0}
+
+VEHICLE_PROFILES = {
+    "rigid": {"fuel_l_per_km": 0.28, "wage_aud_per_hour": 50, "toll_class": "B"},
+    "semi": {"fuel_l_per_km": 0.45, "wage_aud_per_hour": 55, "toll_class": "B"},
+    "b-double": {"fuel_l_per_km": 0.55, "wage_aud_per_hour": 60, "toll_class": "B"},
+}
+
+PRICE_SCENARIOS = {
+    "low": {"diesel_aud_per_l": 1.60, "carbon_aud_per_t": 0.0},
+    "base": {"diesel_aud_per_l": 1.90, "carbon_aud_per_t": 0.0},
+    "high": {"diesel_aud_per_l": 2.30, "carbon_aud_per_t": 35.0},
+}
+
+DEFAULT_VEHICLE = "rigid"
+DEFAULT_PRICES = "base"
+
+
+def _check(arr: np.ndarray, name: str) -> np.ndarray:
+    if not np.all(np.isfinite(arr)) or np.any(arr < 0):
+        raise ValueError(f"{name} must be finite and non-negative")
+    return arr
+
+
+def _column(table: dict, field: str, default=None) -> np.ndarray:
+    """Stack `field` across profiles; a missing field is an error unless defaulted."""
+    values = []
+    for name, row in table.items():
+        if field not in row and default is None:
+            raise ValueError(f"{name!r} is missing {field!r}")
+        values.append(row.get(field, default))
+    return _check(np.array(values, dtype=float), field)
+
+
+def _toll_multipliers(vehicles: dict) -> np.ndarray:
+    try:
+        return np.array(
+            [TOLL_CLASS_MULTIPLIER[v.get("toll_class", "A")] for v in vehicles.values()]
+        )
+    except KeyError as exc:
+        raise ValueError(
+            f"unknown toll_class {exc.args[0]!r}, expected one of "
+            f"{sorted(TOLL_CLASS_MULTIPLIER)}"
+        ) from None
+
+
+def _per_route(values, n: int, name: str) -> np.ndarray:
+    arr = np.atleast_1d(np.asarray(values, dtype=float))
+    if arr.ndim != 1 or len(arr) != n:
+        raise ValueError(f"{name} must have one value per route ({n})")
+    return _check(arr, name)[:, None, None]
+
+
+# ───────────────────────── Engine ─────────────────────────
+def scenario_matrix(
+    distance_km, eta_min, toll_aud=None, vehicles: dict = None, prices: dict = None
+) -> dict:
+    """
+    Return {"cost_aud": (R, V, P), "co2_kg": (R, V), "vehicles": [...],
+    "prices": [...]} for R routes, V vehicle profiles and P price scenarios.
+    `toll_aud` is the class-A (car) toll per route; heavier classes scale it.
+    Raises ValueError on empty or malformed input.
+    """
+    vehicles = VEHICLE_PROFILES if vehicles is None else vehicles
+    prices = PRICE_SCENARIOS if prices is None else prices
+    if not vehicles or not prices:
+        raise ValueError("need at least one vehicle profile and price scenario")
+
+    km = np.atleast_1d(np.asarray(distance_km, dtype=float))
+    if km.ndim != 1 or not len(km):
+        raise ValueError("need at least one route")
+    km = _check(km, "distance_km")[:, None, None]
+    hours = _per_route(eta_min, len(km), "eta_min") / 60
+    toll = (
+        np.zeros(km.shape)
+        if toll_aud is None
+        else _per_route(toll_aud, len(km), "toll_aud")
+    )
+
+    burn = _column(vehicles, "fuel_l_per_km")[None, :, None]
+    wage = _column(vehicles, "wage_aud_per_hour")[None, :, None]
+    mult = _toll_multipliers(vehicles)[None, :, None]
+    fuel_price = _column(prices, "diesel_aud_per_l")[None, None, :]
+    carbon_price = _column(prices, "carbon_aud_per_t", 0.0)[None, None, :]
+
+    litres = km * burn  # (R, V, 1)
+    co2 = litres * CO2_KG_PER_L_DIESEL
+    cost = (
+        litres * fuel_price + hours * wage + toll * mult + co2 / 1000 * carbon_price
+    )  # (R, V, P)
+
+    return {
+        "cost_aud": cost,
+        "co2_kg": co2[:, :, 0],
+        "vehicles": list(vehicles),
+        "prices": list(prices),
+    }
+
+
+def default_estimate(distance_km, eta_min=0.0):
+    """
+    (cost_aud, co2_kg) for the default vehicle and price scenario, excluding
+    tolls. Broadcasts like NumPy: floats for scalar input, else arrays shaped
+    like the inputs.
+    """
+    km, eta = np.broadcast_arrays(
+        np.asarray(distance_km, dtype=float), np.asarray(eta_min, dtype=float)
+    )
+    if km.size == 0:
+        return np.zeros(km.shape), np.zeros(km.shape)
+    m = scenario_matrix(
+        km.ravel(),
+        eta.ravel(),
+        vehicles={DEFAULT_VEHICLE: VEHICLE_PROFILES[DEFAULT_VEHICLE]},
+        prices={DEFAULT_PRICES: PRICE_SCENARIOS[DEFAULT_PRICES]},
+    )
+    cost = m["cost_aud"][:, 0, 0].reshape(km.shape)
+    co2 = m["co2_kg"][:, 0].reshape(km.shape)
+    if not km.shape:
+        return float(cost), float(co2)
+    return cost, co2
+
+
+def cheapest_routes(matrix: dict) -> np.ndarray:
+    """Index of the cheapest route for every (vehicle, price) pair: (V, P)."""
+    return matrix["cost_aud"].argmin(axis=0)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from pathlib import Path
+
+    p = argparse.ArgumentParser(description="Fleet what-if over route options")
+    p.add_argument("routes_json", help='list of {"distance_km", "eta_min", "toll_aud"}')
+    args = p.parse_args()
+
+    routes = json.loads(Path(args.routes_json).read_text())
+    m = scenario_matrix(
+        [r["distance_km"] for r in routes],
+        [r["eta_min"] for r in routes],
+        [r.get("toll_aud", 0.0) for r in routes],
+    )
+    best = cheapest_routes(m)
+    for vi, veh in enumerate(m["vehicles"]):
+        for pi, price in enumerate(m["prices"]):
+            r = best[vi, pi]
+            print(
+                f"{veh:9} {price:5} route {r + 1}: "
+                f"${m['cost_aud'][r, vi, pi]:.2f}, {m['co2_kg'][r, vi]:.1f} kg CO₂"
+            )
@@ -1,12 +1,16 @@
 import httpx
+import json
 import os
 from dotenv import load_dotenv
+
+from backend import upstream
 load_dotenv()
 
 TOLL_API_URL = "https://api.transport.nsw.gov.au/v1/toll-calculator/price"
 TOLL_API_KEY = os.getenv("TFNSW_API_KEY")
 
 def get_toll_price(origin: tuple, destination: tuple, vehicle_type: str = "car", waypoints=None) -> float:
+    """Toll in AUD; raises upstream.Overloaded when shed with nothing cached."""
     if not TOLL_API_KEY:
         raise RuntimeError("TFNSW_API_KEY not set")
     headers = {
@@ -21,11 +25,15 @@ def get_toll_price(origin: tuple, destination: tuple, vehicle_type: str = "car",
     if waypoints:  
         payload["waypoints"] = waypoints
     print("Toll payload:", payload)
-    try:
+    def _post():
         resp = httpx.post(TOLL_API_URL, headers=headers, json=payload, timeout=10)
         resp.raise_for_status()
-        data = resp.json()
+        return resp.json()
+    try:
+        data = upstream.call("tfnsw_toll", json.dumps(payload, sort_keys=True), _post)
         return data.get("totalToll", 0.0)
+    except upstream.Overloaded:
+        raise                       # unknown toll – don't pass it off as 0.0
     except httpx.HTTPStatusError as exc:
         print(f"Toll API error {exc.response.status_code}: {exc.response.text}")
         return 0.0
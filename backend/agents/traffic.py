@@ -1,6 +1,12 @@
 def route_passes_traffic(route_polyline: str, traffic_features, radius=0.001) -> bool:
     """Returns True if the route passes near a live traffic jam/incident."""
     import polyline
+    from backend.agents import lanes
+    nearby = lanes.candidate_hazards(route_polyline, traffic_features, radius * lanes.KM_PER_DEG)
+    if nearby is not None:
+        if not nearby:
+            return False
+        traffic_features = nearby
     for lat, lon in polyline.decode(route_polyline):
         for feat in traffic_features:
             hx, hy = feat["geometry"]["coordinates"]
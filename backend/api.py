@@ -11,7 +11,9 @@ from backend.agents import ingest
 from backend.agents import risk_agent as gpt_risk      
 from backend.agents import risk as rule_risk          
 from backend.agents import cost                        
+from backend.agents import scenario
 from backend import kpi                                
+from backend import upstream
 
 app = FastAPI(title="FreightFlow API")
 
@@ -50,7 +52,19 @@ def route_options(fromLon: float, fromLat: float, toLon: float, toLat: float):
         "geometries": "polyline",
         "access_token": mbx,
     }
-    resp = httpx.get(url, params=params, timeout=20).json()["routes"][:3]
+    def _directions():
+        r = httpx.get(url, params=params, timeout=20)
+        r.raise_for_status()               # only cache successful payloads
+        return r.json()
+
+    try:
+        resp = upstream.call(
+            "mapbox", ("directions", fromLon, fromLat, toLon, toLat), _directions
+        )["routes"][:3]
+    except upstream.Overloaded as exc:
+        raise HTTPException(503, str(exc), headers={"Retry-After": "2"})
+    except httpx.HTTPStatusError as exc:
+        raise HTTPException(502, f"Mapbox error {exc.response.status_code}")
 
     routes = []
     for r in resp:
@@ -91,6 +105,32 @@ def route_options(fromLon: float, fromLat: float, toLon: float, toLat: float):
     }
 
 
+@app.post("/api/scenarios")
+def fleet_scenarios(body: dict = Body(...)):
+    routes = body.get("routes")
+    if not isinstance(routes, list) or not routes:
+        raise HTTPException(422, "'routes' must be a non-empty list")
+    try:
+        m = scenario.scenario_matrix(
+            [r["distance_km"] for r in routes],
+            [r["eta_min"] for r in routes],
+            [r.get("toll_aud", 0.0) for r in routes],
+            vehicles=body.get("vehicles"),
+            prices=body.get("prices"),
+        )
+    except (KeyError, TypeError, AttributeError) as exc:
+        raise HTTPException(422, f"malformed route or profile: {exc}")
+    except ValueError as exc:
+        raise HTTPException(422, str(exc))
+    return {
+        "vehicles": m["vehicles"],
+        "prices":   m["prices"],
+        "cost_aud": m["cost_aud"].round(2).tolist(),
+        "co2_kg":   m["co2_kg"].round(2).tolist(),
+        "cheapest": scenario.cheapest_routes(m).tolist(),
+    }
+
+
 @app.get("/api/kpi")
 def kpi_snapshot():
     return kpi.snapshot()
@@ -0,0 +1,156 @@
+"""
+FreightFlow – upstream admission control
+Singleflight + per-upstream token buckets for Mapbox, TfNSW toll and OpenAI.
+
+    upstream.call("mapbox", key, fn)
+
+• identical in-flight calls (same key) share one result;
+• each upstream has a token-bucket budget; callers queue up to MAX_WAIT_S
+  for a token and are shed with `Overloaded` beyond that;
+• a shed call returns the last good result for its key when one is fresh,
+  else `fallback()` when given, else raises so the caller can degrade.
+
+Callers that retry internally pass `metered=False` and call
+`acquire(upstream)` once per attempt, so every retry spends a token.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+log = logging.getLogger(__name__)
+
+
+# ───────────────────────── Config ─────────────────────────
+def _env(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+MAX_WAIT_S = _env("UPSTREAM_MAX_WAIT_S", 2.0)  # queue time before shedding
+STALE_TTL_S = _env("UPSTREAM_STALE_TTL_S", 900)  # one ingest cycle
+CACHE_SIZE = 256  # per upstream
+
+# name: (tokens per second, burst)
+BUDGETS = {
+    "mapbox": (_env("MAPBOX_RPS", 5), _env("MAPBOX_BURST", 10)),
+    "tfnsw_toll": (_env("TFNSW_RPS", 5), _env("TFNSW_BURST", 5)),
+    "openai": (_env("OPENAI_RPS", 1), _env("OPENAI_BURST", 3)),
+}
+
+
+class Overloaded(RuntimeError):
+    """Raised when an upstream budget is exhausted and nothing cached is usable."""
+
+
+# ───────────────────────── Token bucket ───────────────────
+class TokenBucket:
+    """
+    Reservation-style bucket: a caller takes a token immediately, letting the
+    balance go negative, and sleeps until it would have been refilled. The
+    negative balance is the queue; reservations that would wait longer than
+    `max_wait` are refused instead. A rate <= 0 disables the upstream: every
+    call is shed (cache / fallback still apply).
+    """
+
+    def __init__(self, rate: float, burst: float, max_wait: float = MAX_WAIT_S):
+        self.rate, self.burst, self.max_wait = rate, burst, max_wait
+        self.tokens = burst
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            raise Overloaded("disabled (rate <= 0)")
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            if wait > self.max_wait:
+                raise Overloaded(f"would queue {wait:.1f}s")
+            self.tokens -= 1
+        if wait:
+            time.sleep(wait)
+
+
+_buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in BUDGETS.items()}
+
+
+def acquire(upstream: str) -> None:
+    """Spend one token of `upstream`'s budget, queueing or raising `Overloaded`."""
+    _buckets[upstream].acquire()
+
+
+# ───────────────────────── Singleflight + cache ───────────
+_inflight = {}
+_inflight_lock = threading.Lock()
+_caches = {name: OrderedDict() for name in BUDGETS}  # key -> (timestamp, result)
+_cache_lock = threading.Lock()
+
+
+def _remember(upstream: str, key, result) -> None:
+    with _cache_lock:
+        cache = _caches[upstream]
+        cache[key] = (time.monotonic(), result)
+        cache.move_to_end(key)
+        while len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def _recall(upstream: str, key):
+    """Return (True, result) for a fresh cached result, else (False, None)."""
+    with _cache_lock:
+        hit = _caches[upstream].get(key)
+    if hit and time.monotonic() - hit[0] <= STALE_TTL_S:
+        return True, hit[1]
+    return False, None
+
+
+def _run(upstream: str, key, fn, fallback, metered: bool):
+    try:
+        if metered:
+            acquire(upstream)
+        result = fn()
+    except Overloaded as exc:
+        found, result = _recall(upstream, key)
+        if found:
+            log.warning("%s shed (%s) – serving cached result", upstream, exc)
+            return result
+        if fallback is not None:
+            log.warning("%s shed (%s) – using fallback", upstream, exc)
+            return fallback()
+        raise Overloaded(f"{upstream} budget exhausted ({exc})") from None
+    _remember(upstream, key, result)
+    return result
+
+
+# ───────────────────────── Public entry ───────────────────
+def call(upstream: str, key, fn, fallback=None, metered: bool = True):
+    """
+    Run `fn()` against `upstream`'s budget, sharing the result with every
+    concurrent caller using the same hashable `key`. Only values `fn`
+    returns are cached, so it should raise on upstream error responses.
+    """
+    flight = (upstream, key)
+    with _inflight_lock:
+        fut = _inflight.get(flight)
+        leader = fut is None
+        if leader:
+            fut = _inflight[flight] = Future()
+    if not leader:
+        return fut.result()
+
+    try:
+        result = _run(upstream, key, fn, fallback, metered)
+    except BaseException as exc:
+        fut.set_exception(exc)
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(flight, None)
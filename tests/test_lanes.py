@@ -0,0 +1,116 @@
+import sys
+import threading
+
+import polyline
+import pytest
+
+from backend.agents import hazard, lanes, risk, traffic
+
+ROUTE = polyline.encode([(-33.90 + i * 0.002, 151.10 + i * 0.001) for i in range(60)])
+
+
+def _feat(lat, lon, kind="Crash"):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        "properties": {"type": kind},
+    }
+
+
+# on the route, ~0.5 km off, ~0.9 km off, ~1.5 km off, far away
+FEATURES = [
+    _feat(-33.88, 151.11),
+    _feat(-33.88, 151.1155),
+    _feat(-33.88, 151.1197),
+    _feat(-33.88, 151.126),
+    _feat(-32.90, 151.70, "Flood"),
+    _feat(-33.85, 151.125, "Roadworks"),
+]
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(lanes, "REGISTRY_PATH", tmp_path / "registry.json")
+    return tmp_path / "registry.json"
+
+
+def _checks(features):
+    return (
+        risk.classify_delay_prob(ROUTE, {"features": features}),
+        hazard.route_passes_hazard(ROUTE, features),
+        traffic.route_passes_traffic(ROUTE, features),
+        hazard.route_passes_hazard(ROUTE, features, radius=0.005),
+    )
+
+
+def test_unregistered_route_scans_everything(registry):
+    assert lanes.candidate_hazards(ROUTE, FEATURES) is None
+
+
+@pytest.mark.parametrize(
+    "subset", [FEATURES, FEATURES[1:], FEATURES[3:], FEATURES[3:5]]
+)
+def test_prefilter_matches_full_scan(registry, subset):
+    subset = list(subset)
+    full = _checks(subset)
+    lanes.build([{"id": "test-lane", "polyline": ROUTE}])
+    assert lanes.lane_cells(ROUTE)
+    assert _checks(subset) == full
+
+
+def test_candidates_keep_snapshot_order(registry):
+    lanes.build([{"polyline": ROUTE}])
+    near = lanes.candidate_hazards(ROUTE, FEATURES)
+    assert near == [f for f in FEATURES if f in near]
+    assert FEATURES[4] not in near
+
+
+def test_wider_reach_than_buffer_falls_back(registry):
+    lanes.build([{"polyline": ROUTE}])
+    assert lanes.candidate_hazards(ROUTE, FEATURES, reach_km=5) is None
+
+
+def test_hazard_index_is_cached_per_snapshot():
+    features = list(FEATURES)
+    assert lanes.hazard_index(features) is lanes.hazard_index(features)
+    assert lanes.hazard_index(features) is not lanes.hazard_index(list(FEATURES))
+
+
+def test_hazard_index_is_thread_safe():
+    expected = lanes.hazard_index(list(FEATURES))
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(300):
+                assert lanes.hazard_index(list(FEATURES)) == expected
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(old)
+    assert errors == []
+    assert len(lanes._snapshots) <= lanes.SNAPSHOT_CACHE_SIZE
+
+
+def test_candidate_hazards_loads_registry_once(registry, monkeypatch):
+    lanes.build([{"polyline": ROUTE}])
+    calls = []
+    load = lanes._load
+    monkeypatch.setattr(lanes, "_load", lambda: calls.append(1) or load())
+    assert lanes.candidate_hazards(ROUTE, FEATURES)
+    assert len(calls) == 1
+
+
+def test_broken_registry_disables_fast_path(registry):
+    registry.write_text('{"lanes": {"x": {"cells": ["r3gx2f"]}}}')
+    assert lanes.candidate_hazards(ROUTE, FEATURES) is None
+    assert _checks(FEATURES)[1] is True
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from backend.agents import cost, emission, scenario
+
+
+def test_matrix_shapes_and_default_cell():
+    m = scenario.scenario_matrix([160, 175], [130, 125], [8.5, 0.0])
+    assert m["cost_aud"].shape == (2, 3, 3)
+    assert m["co2_kg"].shape == (2, 3)
+    veh = scenario.VEHICLE_PROFILES["rigid"]
+    price = scenario.PRICE_SCENARIOS["base"]
+    expected = (
+        160 * veh["fuel_l_per_km"] * price["diesel_aud_per_l"]
+        + 130 / 60 * veh["wage_aud_per_hour"]
+        + 8.5 * scenario.TOLL_CLASS_MULTIPLIER[veh["toll_class"]]
+    )
+    vi, pi = m["vehicles"].index("rigid"), m["prices"].index("base")
+    assert m["cost_aud"][0, vi, pi] == pytest.approx(expected)
+
+
+def test_scalar_helpers_match_engine():
+    m = scenario.scenario_matrix(160, 130)
+    vi = m["vehicles"].index(scenario.DEFAULT_VEHICLE)
+    pi = m["prices"].index(scenario.DEFAULT_PRICES)
+    assert cost.estimate_cost(160, 130) == pytest.approx(m["cost_aud"][0, vi, pi])
+    assert emission.estimate_emissions(160) == pytest.approx(m["co2_kg"][0, vi])
+
+
+def test_estimate_cost_adds_quoted_toll_unscaled():
+    assert cost.estimate_cost(160, 130, 8.5) == pytest.approx(
+        cost.estimate_cost(160, 130) + 8.5
+    )
+
+
+def test_scalar_helpers_accept_arrays():
+    km = np.array([1.0, 2.0])
+    co2 = emission.estimate_emissions(km)
+    assert co2.shape == (2,)
+    assert co2[1] == pytest.approx(2 * co2[0])
+    assert cost.estimate_cost(
+        km, np.array([60.0, 90.0]), np.array([0.0, 5.0])
+    ).shape == (2,)
+    assert emission.estimate_emissions(np.array([])).shape == (0,)
+    assert isinstance(emission.estimate_emissions(1.0), float)
+
+
+def test_cheapest_routes_per_vehicle_and_price():
+    m = scenario.scenario_matrix([100, 80], [60, 60], [0.0, 50.0])
+    best = scenario.cheapest_routes(m)
+    assert best.shape == (3, 3)
+    assert np.all(best == 0)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(distance_km=[], eta_min=[]),
+        dict(distance_km=[1, 2], eta_min=[1]),
+        dict(distance_km=[1], eta_min=[1], toll_aud=[1, 2]),
+        dict(
+            distance_km=1,
+            eta_min=1,
+            vehicles={
+                "x": {"fuel_l_per_km": 1, "wage_aud_per_hour": 1, "toll_class": "Z"}
+            },
+        ),
+        dict(distance_km=1, eta_min=1, vehicles={"x": {"fuel_l_per_km": 1}}),
+        dict(distance_km=1, eta_min=1, prices={"p": {"carbon_aud_per_t": 5}}),
+        dict(distance_km=1, eta_min=1, vehicles={}),
+        dict(distance_km=[-5], eta_min=[1]),
+        dict(distance_km=[float("nan")], eta_min=[1]),
+        dict(distance_km=[1], eta_min=[float("inf")]),
+        dict(distance_km=[1], eta_min=[1], toll_aud=[-1]),
+        dict(
+            distance_km=1,
+            eta_min=1,
+            vehicles={"x": {"fuel_l_per_km": -1, "wage_aud_per_hour": 1}},
+        ),
+        dict(
+            distance_km=1, eta_min=1, prices={"p": {"diesel_aud_per_l": float("nan")}}
+        ),
+    ],
+)
+def test_bad_input_raises_value_error(kwargs):
+    with pytest.raises(ValueError):
+        scenario.scenario_matrix(**kwargs)
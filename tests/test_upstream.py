@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+
+from backend import upstream
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(
+        upstream,
+        "_buckets",
+        {n: upstream.TokenBucket(100, 100) for n in upstream.BUDGETS},
+    )
+    monkeypatch.setattr(
+        upstream, "_caches", {n: OrderedDict() for n in upstream.BUDGETS}
+    )
+
+
+def _exhaust(name):
+    upstream._buckets[name] = upstream.TokenBucket(rate=1, burst=0, max_wait=0)
+
+
+def test_concurrent_identical_calls_share_one_result():
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return len(calls)
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(upstream.call("mapbox", "k", slow))
+        )
+        for _ in range(10)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [1] * 10
+
+
+def test_errors_propagate_to_followers_and_are_not_cached():
+    def boom():
+        time.sleep(0.1)
+        raise ValueError("401")
+
+    errors = []
+
+    def worker():
+        try:
+            upstream.call("mapbox", "k", boom)
+        except ValueError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(errors) == 5
+    _exhaust("mapbox")
+    with pytest.raises(upstream.Overloaded):
+        upstream.call("mapbox", "k", lambda: "never")
+
+
+def test_bucket_queues_then_sheds():
+    # burst 1, then one token per 0.1 s: waits of 0, 0.1, 0.2 fit, 0.3+ is shed
+    bucket = upstream.TokenBucket(rate=10, burst=1, max_wait=0.25)
+    start = threading.Barrier(5)
+    outcomes = []
+
+    def worker():
+        start.wait()
+        try:
+            bucket.acquire()
+            outcomes.append("ok")
+        except upstream.Overloaded:
+            outcomes.append("shed")
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    t0 = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(outcomes) == ["ok"] * 3 + ["shed"] * 2
+    assert time.monotonic() - t0 >= 0.19
+
+
+def test_zero_rate_disables_upstream():
+    upstream._buckets["openai"] = upstream.TokenBucket(rate=0, burst=3)
+    with pytest.raises(upstream.Overloaded):
+        upstream.acquire("openai")
+    assert (
+        upstream.call("openai", "k", lambda: "never", fallback=lambda: "rules")
+        == "rules"
+    )
+
+
+def test_shed_serves_cache_then_fallback_then_raises():
+    assert upstream.call("openai", "a", lambda: "fresh") == "fresh"
+    _exhaust("openai")
+    assert upstream.call("openai", "a", lambda: "never") == "fresh"
+    assert (
+        upstream.call("openai", "b", lambda: "never", fallback=lambda: "rules")
+        == "rules"
+    )
+    with pytest.raises(upstream.Overloaded):
+        upstream.call("openai", "b", lambda: "never")
+
+
+def test_unmetered_calls_shed_when_fn_acquires():
+    _exhaust("openai")
+    assert (
+        upstream.call(
+            "openai",
+            "x",
+            lambda: upstream.acquire("openai"),
+            fallback=lambda: "rules",
+            metered=False,
+        )
+        == "rules"
+    )
+
+
+def test_caches_are_per_upstream(monkeypatch):
+    monkeypatch.setattr(upstream, "CACHE_SIZE", 2)
+    upstream.call("mapbox", "route", lambda: "directions")
+    for i in range(5):
+        upstream.call("openai", i, lambda: i)
+    _exhaust("mapbox")
+    assert upstream.call("mapbox", "route", lambda: "never") == "directions"
+    assert list(upstream._caches["openai"]) == [3, 4]